@@ -0,0 +1,4 @@
+from .util import (isiterable, isoperation, shape_for_shape,
+                   shape_for_shape_batch, deprecated)
+from .parameters import (check_constraints, check_constraints_batch,
+                         ParameterRegister)
@@ -0,0 +1,32 @@
+""" numba-compiled helpers for check_constraints_batch. Only imported on first
+    use, since importing numba is slow
+"""
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True, boundscheck=False)
+def num_cmp(op_id, x, y):
+    """ Compares x to y with the operation given by op_id - these branches
+        must match parameters._OP_IDS
+    """
+    if op_id == 0:
+        return x <= y
+    elif op_id == 1:
+        return x >= y
+    elif op_id == 2:
+        return x == y
+    elif op_id == 3:
+        return x != y
+    elif op_id == 4:
+        return x > y
+    else:
+        return x < y
+
+
+@njit(cache=True, boundscheck=False)
+def num_cmp_batch(op_id, values, rhs):
+    out = np.empty(values.shape[0], dtype=np.bool_)
+    for i in range(values.shape[0]):
+        out[i] = num_cmp(op_id, values[i], rhs)
+    return out
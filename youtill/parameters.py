@@ -1,5 +1,196 @@
 import collections
-from util import isiterable, operations, VERBOSITY
+import functools
+from warnings import warn
+from .util import isiterable, operations, VERBOSITY
+
+
+# Compiled predicates for constraint strings and types, keyed by the
+# constraint itself
+_COMPILED = {}
+
+
+def _parse_op(c):
+    """ Splits a numeric constraint string into its operation and RHS value
+        Parameters:
+            c (str): constraint to parse e.g. '<3', '>=0'
+        Returns:
+            (tuple) operation string and (float) RHS value if c starts with an
+            operation, None OTW
+        Example:
+            >>> assert(_parse_op('>=3') == ('>=', 3))
+            >>> assert(_parse_op('<3') == ('<', 3))
+            >>> assert(_parse_op('abc') is None)
+    """
+    head = c[:2]
+    if head in ('<=', '>=', '==', '!='):
+        return head, float(c[2:])
+    head = c[:1]
+    if head in ('<', '>'):
+        return head, float(c[1:])
+    return None
+
+
+def _unconstrained(item, item_name=None):
+    return True
+
+
+def _check_type(c, item, item_name=None):
+    return isinstance(item, c)
+
+
+def _check_equal(c, item, item_name=None):
+    return item == c
+
+
+def _check_numeric(op, rhs, item, item_name=None):
+    try:
+        item = float(item)
+    except (ValueError, TypeError):
+        return False
+    return op(item, rhs)
+
+
+def _check_multiple(predicates, combine, item, item_name=None):
+    return combine(p(item, item_name) for p in predicates)
+
+
+def _check_callable(c, item, item_name=None):
+    if VERBOSITY > 0:
+        print('param {}\n  {}({}) evaluates to {}'.format(
+            item_name,
+            c.__name__,
+            item,
+            c(item)))
+    return c(item)
+
+
+def _compile_constraint(c):
+    """ Compiles a single constraint into a predicate, so that constraint
+        strings like '>=1' are only parsed once
+        Parameters:
+            c: constraint to compile - None, a type, a string, or a callable
+        Returns:
+            (function) predicate taking the item to check and, optionally, its
+            name
+        Example:
+            >>> assert(_compile_constraint(None)('anything'))
+            >>> assert(_compile_constraint(str)('a'))
+            >>> assert(not _compile_constraint(str)(1))
+            >>> assert(_compile_constraint('>=1')(1))
+            >>> assert(not _compile_constraint('<5')(5))
+            >>> assert(not _compile_constraint('<5')('five'))
+            >>> assert(_compile_constraint('abc')('abc'))
+    """
+    # No constraint
+    if c is None:
+        return _unconstrained
+
+    # Constrained by type
+    elif isinstance(c, type):
+        return functools.partial(_check_type, c)
+
+    elif isinstance(c, str):
+        parsed = _parse_op(c)
+
+        # Item should be a number and constrained by some operation
+        if parsed is not None:
+            opstr, rhs = parsed
+            return functools.partial(_check_numeric, operations[opstr], rhs)
+
+        else:
+            return functools.partial(_check_equal, c)
+
+    # If constraint is, for instance, a lambda function verifying that a
+    # parameter is either None or satisfies some other constraint
+    # e.g. (lambda x: x is None or isinstance(x, str))
+    else:
+        return functools.partial(_check_callable, c)
+
+
+def _get_predicate(c):
+    """ Gets the compiled predicate for a single constraint, reusing the
+        compiled version of constraint strings and types seen before
+    """
+    if isinstance(c, (str, type)):
+        predicate = _COMPILED.get(c)
+        if predicate is None:
+            predicate = _COMPILED[c] = _compile_constraint(c)
+        return predicate
+    return _compile_constraint(c)
+
+
+def _is_multiple(constraint):
+    """ Determines if a constraint entry holds multiple constraints - a single
+        constraint string is iterable, but is still a single constraint
+    """
+    return isiterable(constraint) and not isinstance(constraint, str)
+
+
+def _compile_constraints(constraint, check_all=True):
+    """ Compiles all constraints on a parameter into a single predicate
+        Parameters:
+            constraint: a single constraint, or an iterable of them
+            check_all (bool): whether all (True) or any (False) of multiple
+                constraints must be satisfied
+        Returns:
+            (function) predicate taking the item to check and, optionally, its
+            name
+        Example:
+            >>> check = _compile_constraints(('>=1', '<5'))
+            >>> assert(check(1))
+            >>> assert(not check(5))
+            >>> assert(_compile_constraints((str, None), check_all=False)(1))
+    """
+    if _is_multiple(constraint):
+        predicates = tuple(_get_predicate(c) for c in constraint)
+        combine = all if check_all else any
+        return functools.partial(_check_multiple, predicates, combine)
+
+    return _get_predicate(constraint)
+
+
+@functools.lru_cache(maxsize=1024)
+def _compile_hashable_constraints(constraint):
+    return _compile_constraints(constraint)
+
+
+def _get_constraints_predicate(constraint):
+    """ Gets the compiled predicate for all constraints on a parameter, so that
+        registers built with the same constraints share a predicate
+    """
+    try:
+        hash(constraint)
+    except TypeError:
+        return _compile_constraints(constraint)
+    return _compile_hashable_constraints(constraint)
+
+
+# Value types whose check results are safe to memoize
+_MEMOIZABLE_TYPES = (int, float, bool, str, type(None))
+
+
+def _is_memoizable(constraint):
+    """ Determines if the result of checking a constraint depends only on the
+        value checked - i.e. it's built from None, types and strings, not from
+        arbitrary callables
+        Example:
+            >>> assert(_is_memoizable(('>=1', '<5')))
+            >>> assert(_is_memoizable(str))
+            >>> assert(not _is_memoizable(lambda x: x is None))
+            >>> assert(not _is_memoizable((str, lambda x: x is None)))
+    """
+    if _is_multiple(constraint):
+        return all(c is None or isinstance(c, (str, type)) for c in constraint)  # NOQA
+    return constraint is None or isinstance(constraint, (str, type))
+
+
+@functools.lru_cache(maxsize=4096)
+def _cached_check(predicate, param_name, value_type, value):
+    """ Memoizes predicate results - only used for memoizable constraints and
+        values of _MEMOIZABLE_TYPES. The value's type is part of the key since
+        e.g. 1, 1.0 and True compare (and hash) equal
+    """
+    return predicate(value, param_name)
 
 
 def check_constraints(param_value, param_name, constraints, check_all=True):
@@ -12,9 +203,10 @@ def check_constraints(param_value, param_name, constraints, check_all=True):
         Returns:
             bool: whether the param_value is properly constrained
         Example:
+            >>> from collections.abc import Iterable
             >>> v = dict(s=str,
             ...          n=('>=1', '<5'),
-            ...          l=collections.Iterable,
+            ...          l=Iterable,
             ...          na=(None),
             ...          e=(lambda x: True if x is None else isinstance(x, str)))
             >>> assert(check_constraints('a', 's', v))
@@ -27,109 +219,118 @@ def check_constraints(param_value, param_name, constraints, check_all=True):
             >>> assert(check_constraints(None, 'e', v))
             >>> assert(not check_constraints(1, 'e', v))
     """
+    predicate = _compile_constraints(constraints.get(param_name), check_all)
+    return predicate(param_value, param_name)
 
-    def _check_constraint(item, c, item_name=None):
-        """ Helper to determine if item is correctly constrained by c
-            Parameters:
-                item: the value to check
-                c: constraint to check against
-        """
 
-        def _isop(c, opstr):
-            """ Helper to determine if a constraint is the same as an operation string
-                Parameters:
-                    c (str): constraint to check e.g. '<3', '>=0'
-                    opstr (str): operation we're concerned with e.g. '<', '>='
-                Returns:
-                    (bool) True if constraint matches operation, False OTW
-                Example:
-                    >>> assert(_isop('<3', '<')
-                    >>> assert(_isop('>=3', '>=')
-                    >>> assert(_isop('==3', '==')
-                    >>> assert(not _isop('==3', '!=')
-                    >>> assert(not _isop('>=3', '>')
-                    >>> assert(not _isop('<3', '<=')
-            """
-            return c.startswith(opstr) and not c.split(opstr)[1].startswith('=')  # NOQA
-
-        def _getval(c, opstr):
-            """ Helper to get the value on the RHS of the constraint - only
-                called when (opstr in c) is True
-                Parameters:
-                    c (str): constraint containing operation e.g. '<3', '>=0'
-                    opstr (str): operation we're pulling out e.g. '<', '>='
-                Returns:
-                    (float)
-                Example:
-                    >>> assert(_getval('<3', '<') == 3)
-                    >>> assert(_getval('>=3', '>=') == 3)
-                    >>> assert(_getval('==3', '==') == 3)
-            """
-            return float(c.split(opstr)[1])
-
-        # No constraint
-        if c is None:
-            return True
-
-        # Constrained by type
-        elif type(c) == type or c == collections.Iterable:
-            return isinstance(item, c)
+# Integer IDs for each operation string, used by the JIT-compiled batch
+# comparison - these must match the branches of _jit.num_cmp
+_OP_IDS = {
+    '<=': 0,
+    '>=': 1,
+    '==': 2,
+    '!=': 3,
+    '>': 4,
+    '<': 5,
+}
 
-        # Item should be a number and constrained by some operation
-        elif isinstance(c, str):
-            numeric = any([c.startswith(opstr) for opstr in operations.keys()])
-            if numeric:
-                try:
-                    item = float(item)
-                except (ValueError, TypeError):
-                    return False
-                else:
-                    correct_or_dontcare = [op(item, _getval(c, opstr))        # NOQA Check operation
-                                           if _isop(c, opstr)                 # NOQA Only if operation is constraint
-                                           else True                          # NOQA OTW, don't care
-                                           for opstr, op in operations.items()]  # NOQA For all operations given
-                    return all(correct_or_dontcare)
-            else:
-                return item == c
-
-        # If constraint is, for instance, a lambda function verifying that a
-        # parameter is either None or satisfies some other constraint
-        # e.g. (lambda x: x is None or isinstance(x, str))
-        else:
-            if VERBOSITY > 0:
-                print('param {}\n  {}({}) evaluates to {}'.format(
-                    item_name,
-                    c.__name__,
-                    item,
-                    c(item) if c is not None else 'N/A'))
-            return c(item)
-
-    # First get the actual constraint(s)
-    constraint = constraints.get(param_name)
-
-    # If multiple constraints, check all (or any) of them
-    if isiterable(constraint):
-        if check_all:
-            return all([_check_constraint(param_value, c, param_name) for c in constraint])  # NOQA
-        else:
-            return any([_check_constraint(param_value, c, param_name) for c in constraint])  # NOQA
 
-    else:
-        return _check_constraint(param_value, constraint, param_name)
+@functools.lru_cache(maxsize=None)
+def _load_num_cmp_batch():
+    """ Imports the numba-compiled batch comparison on first use, so that
+        importing youtill doesn't pay for numba. Returns None (and warns once)
+        if numba isn't installed
+    """
+    try:
+        from ._jit import num_cmp_batch
+    except ImportError:
+        warn('numba is not installed - falling back to numpy')
+        return None
+    return num_cmp_batch
+
+
+def check_constraints_batch(values, c):
+    """ Checks many numeric values against a single numeric constraint at once,
+        JIT-compiled with numba if it's installed
+        Parameters:
+            values: array-like of numbers to check
+            c (str): numeric constraint to check against e.g. '<3', '>=0'
+        Returns:
+            (numpy.ndarray) flat array of bools, one per value
+        Example:
+            >>> check_constraints_batch([0, 1, 5], '>=1').tolist()
+            [False, True, True]
+            >>> check_constraints_batch(((0, 1), (5, 6)), '<5').tolist()
+            [True, True, False, False]
+            >>> values = [0, 1, 2, float('nan')]
+            >>> for c in ('<=1', '>=1', '==1', '!=1', '>1', '<1'):
+            ...     expected = [check_constraints(v, 'x', {'x': c}) for v in values]  # NOQA
+            ...     assert(check_constraints_batch(values, c).tolist() == expected), c  # NOQA
+    """
+    parsed = _parse_op(c)
+    if parsed is None:
+        raise ValueError('{} is not a numeric constraint'.format(c))
+    opstr, rhs = parsed
+
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError('check_constraints_batch requires numpy')
+
+    values = np.asarray(values, dtype=np.float64).ravel()
+    num_cmp_batch = _load_num_cmp_batch()
+    if num_cmp_batch is None:
+        return np.asarray(operations[opstr](values, rhs), dtype=bool)
+    return num_cmp_batch(_OP_IDS[opstr], values, rhs)
 
 
 class ParameterRegister(collections.OrderedDict):
     def __init__(self, constraints=None, defaults=None):
+        # Cached parameters section of the repr and hashable string, rebuilt
+        # after parameters change
+        self._pretty_cache = None
+        self._hstr = None
         super().__init__()
         self.constraints = constraints
         self.defaults = defaults
 
+        # Compiled predicates for each parameter, as (constraint, predicate,
+        # memoizable) tuples. self.constraints is always read live, and a
+        # predicate is only reused while its parameter's constraint is the
+        # very same object, so editing or replacing self.constraints takes
+        # effect on the next check
+        self._predicates = {}
+
     def register(self, kwarg_name, constraints=None, default=None):
         self.constraints[kwarg_name] = constraints
         self.defaults[kwarg_name] = default
 
+    def _get_kwarg_predicate(self, kwarg_name):
+        constraint = self.constraints.get(kwarg_name)
+        entry = self._predicates.get(kwarg_name)
+        if entry is not None and entry[0] is constraint:
+            return entry[1:]
+
+        predicate = _get_constraints_predicate(constraint)
+        try:
+            hash(constraint)
+        except TypeError:
+            # e.g. a list of constraints, which could be changed in place
+            self._predicates.pop(kwarg_name, None)
+            return predicate, False
+
+        memoizable = _is_memoizable(constraint)
+        self._predicates[kwarg_name] = (constraint, predicate, memoizable)
+        return predicate, memoizable
+
+    def _check_kwarg(self, kwarg_name, value):
+        predicate, memoizable = self._get_kwarg_predicate(kwarg_name)
+        if memoizable and type(value) in _MEMOIZABLE_TYPES:
+            return _cached_check(predicate, kwarg_name, type(value), value)
+        return predicate(value, kwarg_name)
+
     def check_kwargs(self, **kwargs):
-        valid = {k: check_constraints(v, k, self.constraints) for k, v in kwargs.items()}  # NOQA
+        valid = {k: self._check_kwarg(k, v) for k, v in kwargs.items()}
         return valid
 
     def set_uninitialized_params(self, defaults=None):
@@ -150,15 +351,64 @@ class ParameterRegister(collections.OrderedDict):
         return '{} expects {} but got {}'.format(key, self.constraints[key], kwarg_dict[key])  # NOQA
 
     def set(self, **kwargs):
-        no_check = kwargs.get('no_check')
+        no_check = kwargs.pop('no_check', False)
         if not no_check:
-            is_good = self.check_kwargs(**kwargs)
-            if not all(is_good.values()):
-                bad_kwargs = ', '.join([self._err_fmt(kwarg, kwargs) for kwarg, good in is_good.items() if not good])  # NOQA
-                raise ValueError(bad_kwargs)
+            bad_kwargs = [self._err_fmt(k, kwargs)
+                          for k, v in kwargs.items()
+                          if not self._check_kwarg(k, v)]
+            if bad_kwargs:
+                raise ValueError(', '.join(bad_kwargs))
+
+        self.update(kwargs)
+
+    def __reduce__(self):
+        """ Pickles without the compiled predicates and cached strings, which
+            are rebuilt on demand and may hold unpicklable closures
+            Example:
+                >>> import pickle
+                >>> p = ParameterRegister({'n': ('>=1', '<5')}, {'n': 1})
+                >>> p.set(n=2)
+                >>> q = pickle.loads(pickle.dumps(p))
+                >>> assert(q == p and q.constraints == p.constraints)
+                >>> assert(q.hashable_str == 'n:2')
+                >>> assert(q.check_kwargs(n=5) == {'n': False})
+        """
+        cls, args, state, listitems, dictitems = super().__reduce__()
+        state = {k: v for k, v in (state or {}).items()
+                 if k not in ('_predicates', '_pretty_cache', '_hstr')}
+        return cls, args, state, listitems, dictitems
+
+    def _clear_caches(self):
+        self._pretty_cache = None
+        self._hstr = None
+
+    # OrderedDict's C methods don't go through __setitem__/__delitem__, so
+    # every mutating method clears the caches itself
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._clear_caches()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._clear_caches()
+
+    def pop(self, *args):
+        value = super().pop(*args)
+        self._clear_caches()
+        return value
+
+    def popitem(self, last=True):
+        item = super().popitem(last=last)
+        self._clear_caches()
+        return item
+
+    def clear(self):
+        super().clear()
+        self._clear_caches()
 
-        for k, v in kwargs.items():
-            self[k] = v
+    def move_to_end(self, key, last=True):
+        super().move_to_end(key, last=last)
+        self._clear_caches()
 
     # TODO fix this
     #def update(self, **kwargs):
@@ -172,21 +422,25 @@ class ParameterRegister(collections.OrderedDict):
 
     @property
     def hashable_str(self):
-        return ','.join(['{}:{}'.format(k, v) for k, v in self.items()])
+        if self._hstr is None:
+            self._hstr = ','.join('{}:{}'.format(k, v) for k, v in self.items())  # NOQA
+        return self._hstr
 
     @property
     def _pretty(self):
-        s = self.__class__.__name__
-        for k, v in self.items():
-            s += '\n  {}: {}'.format(k, v.__repr__())
-        s += '\nConstraints'
-        for k, v in self.constraints.items():
-            s += '\n  {}: {}'.format(k, v)
-        s += '\nDefaults'
-        for k, v in self.defaults.items():
-            s += '\n  {}: {}'.format(k, v.__repr__())
-        s += '\n'
-        return s
+        # Constraints and defaults are plain dicts that may be edited directly,
+        # so only the parameters section is cached
+        if self._pretty_cache is None:
+            self._pretty_cache = ''.join('\n  {}: {!r}'.format(k, v)
+                                         for k, v in self.items())
+        parts = [self.__class__.__name__, self._pretty_cache, '\nConstraints']
+        parts.extend('\n  {}: {}'.format(k, v)
+                     for k, v in self.constraints.items())
+        parts.append('\nDefaults')
+        parts.extend('\n  {}: {!r}'.format(k, v)
+                     for k, v in self.defaults.items())
+        parts.append('\n')
+        return ''.join(parts)
 
     def __repr__(self):
         return self._pretty
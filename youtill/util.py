@@ -1,20 +1,24 @@
-from numpy import prod
-import collections
+import functools
+import operator
+from collections.abc import Iterable
+from math import prod
 from warnings import warn
 
 VERBOSITY = 0
 
-operations = collections.OrderedDict()
-operations['<='] = lambda x, y: x <= y
-operations['>='] = lambda x, y: x >= y
-operations['=='] = lambda x, y: x == y
-operations['!='] = lambda x, y: x != y
-operations['>'] = lambda x, y: x > y
-operations['<'] = lambda x, y: x < y
+operations = {
+    '<=': operator.le,
+    '>=': operator.ge,
+    '==': operator.eq,
+    '!=': operator.ne,
+    '>': operator.gt,
+    '<': operator.lt,
+}
 
 
 def isiterable(item):
-    return isinstance(item, collections.Iterable)
+    # Check the common concrete types first, since they skip the ABC machinery
+    return isinstance(item, (tuple, list)) or isinstance(item, Iterable)
 
 
 def isoperation(string):
@@ -28,7 +32,7 @@ def isoperation(string):
             >>> assert(isoperation('>'))
             >>> assert(isoperation('<'))
     """
-    return string in operations.keys()
+    return string in operations
 
 
 def shape_for_shape(shape_a, dim_b1, ndims=2):
@@ -46,48 +50,106 @@ def shape_for_shape(shape_a, dim_b1, ndims=2):
             <tuple> if typecast is None
 
         Example:
-            >>> from numpy import arange
-            >>> a = arange(1, 25).reshape(3, 8)
-            >>> shape_for_shape(a.shape, 6)
+            >>> shape = (3, 8)
+            >>> shape_for_shape(shape, 6)
             (6, 4)
-            >>> shape_for_shape(a.shape, 1)
+            >>> shape_for_shape(shape, 1)
             (1, 24)
-            >>> shape_for_shape(a.shape, 24)
+            >>> shape_for_shape(shape, 24)
             (24, 1)
-            >>> shape_for_shape(a.shape, 12)
+            >>> shape_for_shape(shape, 12)
             (12, 2)
-            >>> shape_for_shape(a.shape, 12, ndims=3)
+            >>> shape_for_shape(shape, 12, ndims=3)
             (1, 12, 2)
-            >>> shape_for_shape(a.shape, 1, ndims=5)
+            >>> shape_for_shape(shape, 1, ndims=5)
             (1, 1, 1, 1, 24)
             >>> try:
-            ...     shape_for_shape(a.shape, 5)
+            ...     shape_for_shape(shape, 5)
             ... except ValueError as err:
             ...     print("24 is not divisible by 5")
             24 is not divisible by 5
 
     """
 
-    dim_b2 = prod(shape_a) / dim_b1
-    if int(dim_b2) != dim_b2:
+    dim_b2, remainder = divmod(prod(shape_a), dim_b1)
+    if remainder:
         raise ValueError("{!s} is not divisible by {:d}".format(shape_a, dim_b1))  # NOQA
 
     out_shape = [1 for i in range(ndims - 2)]
-    out_shape.extend([dim_b1, int(dim_b2)])
+    out_shape.extend([dim_b1, dim_b2])
 
     return tuple(out_shape)
 
 
+def shape_for_shape_batch(shape_a, dims_b1, ndims=2):
+    """ Vectorized shape_for_shape - given a tensor shape and many single
+    dimensions, computes the n-dimensional shape satisfying each of them
+
+        Parameters:
+            shape_a <list-like>: dimensionality of tensor
+            dims_b1 <list-like>: single dimensions of desired tensor shapes
+            ndims <int>: determines how many dimensions to expand into, if not 2
+                - must be at least 2
+        Returns:
+            <numpy.ndarray> of shape (len(dims_b1), ndims), one shape per row
+
+        Example:
+            >>> shape_for_shape_batch((3, 8), [6, 1, 24]).tolist()
+            [[6, 4], [1, 24], [24, 1]]
+            >>> shape_for_shape_batch((3, 8), [12], ndims=3).tolist()
+            [[1, 12, 2]]
+            >>> try:
+            ...     shape_for_shape_batch((3, 8), [6, 5])
+            ... except ValueError as err:
+            ...     print("24 is not divisible by 5")
+            24 is not divisible by 5
+            >>> try:
+            ...     shape_for_shape_batch((3, 8), [6, 0])
+            ... except ValueError as err:
+            ...     print("dimensions must be nonzero")
+            dimensions must be nonzero
+
+    """
+    # Imported here so that importing youtill doesn't pay for numpy
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError('shape_for_shape_batch requires numpy')
+
+    if ndims < 2:
+        raise ValueError("ndims must be at least 2, got {:d}".format(ndims))
+
+    dims_b1 = np.asarray(dims_b1, dtype=np.int64).ravel()
+    if not dims_b1.all():
+        raise ValueError("dimensions must be nonzero, got {!s}".format(dims_b1))  # NOQA
+    dims_b2, remainders = np.divmod(prod(shape_a), dims_b1)
+    if remainders.any():
+        raise ValueError("{!s} is not divisible by {!s}".format(shape_a, dims_b1[remainders != 0]))  # NOQA
+
+    out_shape = np.ones((dims_b1.size, ndims), dtype=np.int64)
+    out_shape[:, -2] = dims_b1
+    out_shape[:, -1] = dims_b2
+
+    return out_shape
+
+
 def deprecated(f):
     """ Allows function decoration to raise a warning when called
         Raises a UserWarning instead of DeprecationWarning so that it's
-        detectable in an IPython session.
+        detectable in an IPython session. The warning is only raised on the
+        first call.
         For use, see examples/deprecated.py
     """
-    def deprec_warn():
-        deprecation_msg = '{} is deprecated - consider replacing it'.format(f.__name__)  # NOQA
-        warn(deprecation_msg)
-        f()
+    deprecation_msg = '{} is deprecated - consider replacing it'.format(f.__name__)  # NOQA
+    warned = False
+
+    @functools.wraps(f)
+    def deprec_warn(*args, **kwargs):
+        nonlocal warned
+        if not warned:
+            warn(deprecation_msg, stacklevel=2)
+            warned = True
+        return f(*args, **kwargs)
     return deprec_warn
 
 